@@ -0,0 +1,44 @@
+"""
+Admin route handlers.
+Exposes the requests captured by the profiling middleware (slow or profiled calls).
+"""
+
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from app.api.deps import require_profiling_token
+from app.core.profiling import request_profiler
+
+router: APIRouter = APIRouter(dependencies=[Depends(require_profiling_token)])
+
+
+@router.get("/profiles")
+async def list_profiles() -> List[Dict[str, Any]]:
+    """
+    Lists captured requests, newest first, with their stage timings.
+    """
+    return request_profiler.list_records()
+
+
+@router.get("/profiles/{record_id}", response_class=PlainTextResponse)
+async def download_profile(record_id: str) -> PlainTextResponse:
+    """
+    Downloads a captured request as plain text: stage timings followed by
+    the cProfile report when the request was profiled.
+    """
+    record = request_profiler.get_record(record_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    lines = [
+        f"{record['method']} {record['path']} -> {record['status_code']}",
+        f"duration_ms: {record['duration_ms']}",
+    ]
+    lines += [f"  {name}: {ms}" for name, ms in record["stages"].items()]
+    if record["profile"]:
+        lines += ["", record["profile"]]
+
+    return PlainTextResponse(
+        "\n".join(lines),
+        headers={"Content-Disposition": f'attachment; filename="{record_id}.txt"'},
+    )
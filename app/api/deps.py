@@ -1,34 +1,87 @@
 """
 API Dependencies.
 Contains reusable dependencies for authentication and request processing.
+Clients authenticate either with HTTP Basic (Bcrypt check) or with a signed
+Bearer token obtained from /token (HMAC check, no Bcrypt).
 """
 
-from typing import Dict, Any
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from typing import Dict, Any, Optional
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.security import (
+    HTTPAuthorizationCredentials,
+    HTTPBasic,
+    HTTPBasicCredentials,
+    HTTPBearer,
+)
 from app.models.user import UserRepo
 from app.core.security import verify_password
+from app.core.tokens import InvalidTokenError, token_signer
+from app.core.profiling import PROFILING_HEADER, is_authorized
 
-security = HTTPBasic()
+security = HTTPBasic(auto_error=False)
+bearer = HTTPBearer(auto_error=False)
 
 
-async def get_current_active_user(
-    credentials: HTTPBasicCredentials = Depends(security),
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Basic, Bearer"},
+    )
+
+
+async def authenticate_basic(
+    credentials: Optional[HTTPBasicCredentials] = Depends(security),
 ) -> Dict[str, Any]:
     """
-    Dependency to get the user from the database and verify credentials.
+    Dependency to get the user from the database and verify Basic credentials.
     Returns the user dictionary if valid.
     """
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+
     # Appel asynchrone au repository
     user = await UserRepo.get_by_email(credentials.username)
 
     if not user or not verify_password(
         credentials.password, str(user["password_hash"])
     ):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Basic"},
-        )
+        raise _unauthorized("Incorrect email or password")
 
     return user
+
+
+async def get_current_active_user(
+    token: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    credentials: Optional[HTTPBasicCredentials] = Depends(security),
+) -> Dict[str, Any]:
+    """
+    Dependency to get the authenticated user record, using either scheme.
+    With a Bearer token the password check is skipped; only the row is fetched.
+    """
+    if token is None:
+        return await authenticate_basic(credentials)
+
+    try:
+        email = token_signer.verify(token.credentials)
+    except InvalidTokenError as e:
+        raise _unauthorized(str(e)) from e
+
+    user = await UserRepo.get_by_email(email)
+    if not user:
+        raise _unauthorized("Unknown user")
+    return user
+
+
+async def require_profiling_token(
+    token: Optional[str] = Header(None, alias=PROFILING_HEADER),
+) -> None:
+    """
+    Dependency guarding the profiling admin endpoints.
+    Requires the X-Profiling-Token header to match PROFILING_TOKEN.
+    """
+    if not is_authorized(token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or missing profiling token",
+        )
@@ -1,21 +1,26 @@
 """
 API Route handlers.
-Defines the endpoints for user registration and account activation.
+Defines the endpoints for user registration, session tokens and account activation.
 """
 
 import secrets
 import logging
-import time
 from typing import Dict, Any
-import smtplib
 import psycopg
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBasic
 from app.schemas.user import UserCreate, ActivationRequest
 from app.models.user import UserRepo
+from app.models.activation_code import ConsumeResult, activation_codes
 from app.core.security import get_password_hash
-from app.core.email import send_activation_email
-from app.api.deps import get_current_active_user
+from app.core.email import (
+    MailSpool,
+    check_smtp_connection,
+    send_activation_email,
+    smtp_breaker,
+)
+from app.core.tokens import token_signer
+from app.api.deps import authenticate_basic, get_current_active_user
 from app.db import get_db_connection
 from app.core.config import settings
 
@@ -36,11 +41,17 @@ async def register(user_in: UserCreate) -> Dict[str, str]:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     code: str = str(secrets.randbelow(10000)).zfill(4)
-    expires_at: float = time.time() + 60
 
-    await UserRepo.create(
-        user_in.email, get_password_hash(user_in.password), code, expires_at
-    )
+    await UserRepo.create(user_in.email, get_password_hash(user_in.password))
+    try:
+        await activation_codes.set(user_in.email, code, settings.ACTIVATION_CODE_TTL)
+    except Exception:
+        # Without a code the account could never be activated: let the user retry
+        logger.error(
+            "Storing activation code failed for %s, rolling back", user_in.email
+        )
+        await UserRepo.delete(user_in.email)
+        raise
 
     # Send actual email asynchronously
     await send_activation_email(user_in.email, code)
@@ -49,6 +60,23 @@ async def register(user_in: UserCreate) -> Dict[str, str]:
     return {"message": "User registered. Please check your email for the code."}
 
 
+@router.post("/token")
+async def issue_token(
+    current_user: Dict[str, Any] = Depends(authenticate_basic),
+) -> Dict[str, Any]:
+    """
+    Exchanges Basic Authentication credentials for a signed, short-lived Bearer token.
+    Subsequent calls can send the token instead of the password to skip Bcrypt.
+    """
+    email: str = str(current_user["email"])
+    logger.info("Session token issued for user: %s", email)
+    return {
+        "access_token": token_signer.create(email, settings.TOKEN_TTL),
+        "token_type": "bearer",
+        "expires_in": settings.TOKEN_TTL,
+    }
+
+
 @router.post("/activate")
 async def activate(
     activation: ActivationRequest,
@@ -56,7 +84,7 @@ async def activate(
 ) -> Dict[str, str]:
     """
     Activates a user account if the provided code matches and has not expired.
-    Requires Basic Authentication.
+    Requires Basic Authentication or a Bearer token.
     """
     email: str = str(current_user["email"])
     logger.info("Activation attempt for user: %s", email)
@@ -66,15 +94,17 @@ async def activate(
         logger.info("Activation skipped: User %s is already active", email)
         return {"message": "Already active"}
 
-    if time.time() > float(current_user["code_expires_at"]):
+    result = await activation_codes.consume(email, activation.code)
+
+    if result is ConsumeResult.EXPIRED:
         logger.warning("Activation failed: Code for %s has expired", email)
         raise HTTPException(status_code=400, detail="Code expired")
 
-    if activation.code != str(current_user["activation_code"]):
+    if result is ConsumeResult.INVALID:
         logger.warning("Activation failed: Invalid code provided for %s", email)
         raise HTTPException(status_code=400, detail="Invalid code")
 
-    await UserRepo.set_active(str(current_user["email"]))
+    await UserRepo.set_active(email)
     logger.info("User account activated successfully: %s", email)
     return {"message": "Account activated successfully"}
 
@@ -83,6 +113,7 @@ async def activate(
 async def health_check() -> Dict[str, Any]:
     """
     Checks the health of the application and its dependencies (DB and SMTP).
+    Also reports the SMTP circuit breaker state and the number of spooled emails.
     Returns 503 if any dependency is unreachable.
     """
     health_status: Dict[str, Any] = {
@@ -100,15 +131,17 @@ async def health_check() -> Dict[str, Any]:
         logger.error("Health check failed: Database unreachable. %s", e)
         health_status["status"] = "unhealthy"
 
-    # 2. Check SMTP
-    try:
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=3) as server:
-            server.noop()
-            health_status["dependencies"]["smtp"] = "healthy"
-    except (smtplib.SMTPException, ConnectionError, TimeoutError) as e:
-        logger.error("Health check failed: SMTP server unreachable. %s", e)
+    # 2. Check SMTP (fails fast while the circuit breaker is open)
+    if await check_smtp_connection():
+        health_status["dependencies"]["smtp"] = "healthy"
+    else:
+        logger.error("Health check failed: SMTP server unreachable.")
         health_status["status"] = "unhealthy"
 
+    health_status["circuits"] = {
+        "smtp": {**smtp_breaker.snapshot(), "spooled_emails": MailSpool.pending()}
+    }
+
     if health_status["status"] == "unhealthy":
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=health_status
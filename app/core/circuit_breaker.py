@@ -0,0 +1,161 @@
+"""
+Circuit breaker module.
+Stops calling an unhealthy dependency after repeated failures so callers fail fast
+instead of waiting out connection timeouts.
+"""
+
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Possible states of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Classic closed/open/half-open circuit breaker.
+
+    - CLOSED: calls go through; consecutive failures are counted.
+    - OPEN: calls are rejected until the cool-down has elapsed.
+    - HALF_OPEN: a limited number of trial calls are let through; a success
+      closes the circuit, a failure opens it again. Trial slots whose outcome is
+      never reported (e.g. a cancelled call) are handed out again after
+      `recovery_timeout`, so the circuit cannot stay stuck.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_calls = 0
+        self._trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> CircuitState:
+        """Returns the current state, moving OPEN to HALF_OPEN once cooled down."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        """Computes the state; the caller must hold the lock."""
+        if (
+            self._state is CircuitState.OPEN
+            and self._opened_at is not None
+            and self._clock() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+            logger.info("Circuit '%s' is half-open: allowing trial calls.", self.name)
+        elif (
+            self._state is CircuitState.HALF_OPEN
+            and self._half_open_calls >= self.half_open_max_calls
+            and self._trial_started_at is not None
+            and self._clock() - self._trial_started_at >= self.recovery_timeout
+        ):
+            logger.warning(
+                "Circuit '%s': trial call(s) never reported, allowing new ones.",
+                self.name,
+            )
+            self._half_open_calls = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Returns True if a call to the dependency may be attempted right now.
+        In HALF_OPEN state, each allowed call consumes one trial slot.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state is CircuitState.CLOSED:
+                return True
+            if (
+                state is CircuitState.HALF_OPEN
+                and self._half_open_calls < self.half_open_max_calls
+            ):
+                self._half_open_calls += 1
+                self._trial_started_at = self._clock()
+                return True
+            return False
+
+    def record_success(self) -> bool:
+        """
+        Records a successful call and closes the circuit.
+        Returns True if this call moved the circuit back to CLOSED.
+        """
+        with self._lock:
+            was_closed = self._state is CircuitState.CLOSED
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._half_open_calls = 0
+        if not was_closed:
+            logger.info("Circuit '%s' closed: dependency recovered.", self.name)
+        return not was_closed
+
+    def record_failure(self) -> None:
+        """Records a failed call, opening the circuit when the threshold is reached."""
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state is CircuitState.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                if self._state is not CircuitState.OPEN:
+                    logger.warning(
+                        "Circuit '%s' opened after %d consecutive failure(s).",
+                        self.name,
+                        self._failures,
+                    )
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                self._half_open_calls = 0
+
+    def reset(self) -> None:
+        """Forces the circuit back to its initial CLOSED state."""
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._half_open_calls = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a JSON-serializable view of the breaker for health and metrics."""
+        with self._lock:
+            state = self._current_state()
+            retry_in: Optional[float] = None
+            if state is CircuitState.OPEN and self._opened_at is not None:
+                retry_in = max(
+                    0.0, self.recovery_timeout - (self._clock() - self._opened_at)
+                )
+            return {
+                "state": state.value,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout": self.recovery_timeout,
+                "retry_in": retry_in,
+            }
@@ -22,6 +22,38 @@ class Settings:  # pylint: disable=too-few-public-methods
     SMTP_HOST: str = os.getenv("SMTP_HOST", "localhost")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "1025"))
     EMAILS_FROM: str = os.getenv("EMAILS_FROM", "noreply@example.com")
+    # Session tokens: "kid:secret" pairs, the first one signs new tokens
+    TOKEN_SIGNING_KEYS: str = os.getenv("TOKEN_SIGNING_KEYS", "")
+    TOKEN_TTL: int = int(os.getenv("TOKEN_TTL", "900"))
+    # Request profiling (off by default)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_SLOW_REQUEST_MS: float = float(
+        os.getenv("PROFILING_SLOW_REQUEST_MS", "500")
+    )
+    PROFILING_BUFFER_SIZE: int = int(os.getenv("PROFILING_BUFFER_SIZE", "50"))
+    # Activation codes: "postgres" (shared table) or "memory" (single node only)
+    ACTIVATION_CODE_STORE: str = os.getenv("ACTIVATION_CODE_STORE", "postgres")
+    ACTIVATION_CODE_TTL: float = float(os.getenv("ACTIVATION_CODE_TTL", "60"))
+    SMTP_TIMEOUT: float = float(os.getenv("SMTP_TIMEOUT", "3"))
+    # Circuit breaker around the SMTP relay
+    SMTP_BREAKER_FAILURE_THRESHOLD: int = int(
+        os.getenv("SMTP_BREAKER_FAILURE_THRESHOLD", "3")
+    )
+    SMTP_BREAKER_RECOVERY_TIMEOUT: float = float(
+        os.getenv("SMTP_BREAKER_RECOVERY_TIMEOUT", "30")
+    )
+    SMTP_BREAKER_HALF_OPEN_MAX_CALLS: int = int(
+        os.getenv("SMTP_BREAKER_HALF_OPEN_MAX_CALLS", "1")
+    )
+    # Directory where undeliverable emails are queued for later replay.
+    # Must be private to the app user (relative to the working directory by default)
+    SMTP_SPOOL_DIR: str = os.getenv("SMTP_SPOOL_DIR", "var/mail_spool")
 
     @property
     def database_url(self) -> str:
@@ -1,35 +1,277 @@
 """
 Email service module.
 Handles sending activation codes via SMTP to the configured mail server.
+SMTP calls go through a circuit breaker; mails that cannot be delivered are
+spooled on disk and replayed once the relay is reachable again.
 """
 
+import asyncio
+import contextvars
 import logging
+import os
+import time
+import uuid
+from email import message_from_bytes
+from email.message import Message
 from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Optional
 import aiosmtplib
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
+from app.core.profiling import timed_stage
 
 logger = logging.getLogger(__name__)
 
+# Shared by the email sender and the /health probe
+smtp_breaker = CircuitBreaker(
+    "smtp",
+    failure_threshold=settings.SMTP_BREAKER_FAILURE_THRESHOLD,
+    recovery_timeout=settings.SMTP_BREAKER_RECOVERY_TIMEOUT,
+    half_open_max_calls=settings.SMTP_BREAKER_HALF_OPEN_MAX_CALLS,
+)
+
+SMTP_ERRORS = (aiosmtplib.SMTPException, ConnectionError, TimeoutError, OSError)
+
+# Relay unreachable or not answering: these count against the breaker.
+# Other SMTP errors are replies from a working relay about a single message.
+SMTP_UNAVAILABLE_ERRORS = (
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPTimeoutError,
+    OSError,
+)
+
+# Spool-only header: when the content of a spooled message stops being useful
+EXPIRES_HEADER = "X-Expires-At"
+
+
+class MailSpool:
+    """
+    On-disk queue of messages that could not be delivered.
+    Each message is stored as a single .eml file; file names sort in arrival order.
+    Messages carrying an X-Expires-At header are dropped once that time has passed.
+    """
+
+    _replay_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _directory() -> Path:
+        return Path(settings.SMTP_SPOOL_DIR)
+
+    @staticmethod
+    def _ensure_private(directory: Path) -> None:
+        """
+        Spooled mails hold live activation codes and are relayed as-is, so the
+        directory must belong to this process' user and be closed to others.
+        """
+        info = directory.stat()
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"Spool directory {directory} is not owned by us")
+        if info.st_mode & 0o077:
+            directory.chmod(0o700)
+
+    @classmethod
+    def put(cls, msg: Message) -> Path:
+        """Writes a message to the spool atomically (mode 0600) and returns its path."""
+        directory = cls._directory()
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        cls._ensure_private(directory)
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex}"
+        tmp_path = directory / f"{name}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as spool_file:
+            spool_file.write(msg.as_bytes())
+        return tmp_path.rename(directory / f"{name}.eml")
+
+    @classmethod
+    def pending(cls) -> int:
+        """Returns the number of messages waiting in the spool."""
+        directory = cls._directory()
+        if not directory.is_dir():
+            return 0
+        return sum(1 for _ in directory.glob("*.eml"))
+
+    @classmethod
+    async def replay(cls) -> int:
+        """
+        Sends spooled messages in order until the spool is empty or the breaker
+        refuses further calls. Expired messages are discarded without being sent.
+        Returns the number of messages delivered.
+        """
+        directory = cls._directory()
+        if not directory.is_dir():
+            return 0
+        try:
+            cls._ensure_private(directory)
+        except PermissionError as e:
+            logger.error("Refusing to replay spooled emails: %s", e)
+            return 0
+
+        delivered = 0
+        for path in sorted(directory.glob("*.eml")):
+            msg = message_from_bytes(path.read_bytes())
+            expires_at = msg[EXPIRES_HEADER]
+            if expires_at is not None:
+                del msg[EXPIRES_HEADER]
+                if time.time() >= float(expires_at):
+                    logger.info("Dropping expired spooled email %s", path.name)
+                    path.unlink(missing_ok=True)
+                    continue
+
+            if not smtp_breaker.allow_request():
+                break
+            try:
+                await _deliver(msg)
+            except SMTP_UNAVAILABLE_ERRORS as e:
+                smtp_breaker.record_failure()
+                logger.error("Replay of spooled email %s failed: %s", path.name, e)
+                break
+            except aiosmtplib.SMTPException as e:
+                smtp_breaker.record_success()
+                if not _is_permanent(e):
+                    logger.warning("Replay of %s deferred by relay: %s", path.name, e)
+                    break
+                logger.error("Spooled email %s rejected, dropping: %s", path.name, e)
+                path.unlink(missing_ok=True)
+                continue
+            smtp_breaker.record_success()
+            path.unlink(missing_ok=True)
+            delivered += 1
+
+        if delivered:
+            logger.info("Replayed %d spooled email(s).", delivered)
+        return delivered
+
+    @classmethod
+    def schedule_replay(cls) -> None:
+        """
+        Starts a background replay unless one is already running.
+        The task gets an empty context so its SMTP time is not charged to the
+        request that happened to trigger it.
+        """
+        if cls._replay_task is None or cls._replay_task.done():
+            cls._replay_task = asyncio.create_task(
+                cls.replay(), context=contextvars.Context()
+            )
+
+
+@timed_stage("smtp")
+async def _deliver(msg: Message) -> None:
+    """Sends a message to the configured SMTP relay."""
+    await aiosmtplib.send(
+        msg,
+        hostname=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        timeout=settings.SMTP_TIMEOUT,
+    )
+
+
+def _is_permanent(error: aiosmtplib.SMTPException) -> bool:
+    """Tells whether the relay rejected a message for good (5xx reply)."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(
+            refused.code >= 500 for refused in error.recipients
+        )
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+
+
+def _spool(msg: Message, email_to: str) -> None:
+    """Spools a message; a spool write failure is logged, never raised."""
+    try:
+        MailSpool.put(msg)
+    except OSError as e:
+        logger.error("Could not spool email to %s, dropping it: %s", email_to, e)
+
+
+def _record_smtp_success() -> None:
+    """Closes the breaker and flushes the spool when the relay has recovered."""
+    if smtp_breaker.record_success() or MailSpool.pending():
+        MailSpool.schedule_replay()
+
+
+def _format_ttl(seconds: float) -> str:
+    """Renders a code lifetime for the email body, e.g. '1 minute' or '90 seconds'."""
+    total = int(seconds)
+    if total % 60 == 0:
+        minutes = total // 60
+        return f"{minutes} minute{'s' if minutes != 1 else ''}"
+    return f"{total} second{'s' if total != 1 else ''}"
+
+
+def _with_expiry(msg: Message) -> Message:
+    """Marks an activation email as useless once its code has expired."""
+    msg[EXPIRES_HEADER] = str(time.time() + settings.ACTIVATION_CODE_TTL)
+    return msg
+
 
 async def send_activation_email(email_to: str, code: str) -> None:
     """
     Sends a 4-digit activation code using aiosmtplib (asynchronous).
+    Spools the message instead when the SMTP circuit is open, the relay is
+    unreachable or it defers the message (4xx). Permanent rejections (5xx) are
+    logged and dropped; they do not count against the circuit breaker.
     """
     subject: str = "Your Activation Code"
-    body: str = f"Your 4-digit activation code is: {code}. It expires in 1 minute."
+    body: str = (
+        f"Your 4-digit activation code is: {code}. "
+        f"It expires in {_format_ttl(settings.ACTIVATION_CODE_TTL)}."
+    )
 
     msg: MIMEText = MIMEText(body)
     msg["Subject"] = subject
     msg["From"] = settings.EMAILS_FROM
     msg["To"] = email_to
 
+    if not smtp_breaker.allow_request():
+        logger.warning("SMTP circuit open: spooling email to %s", email_to)
+        _spool(_with_expiry(msg), email_to)
+        return
+
+    try:
+        await _deliver(msg)
+    except SMTP_UNAVAILABLE_ERRORS as e:
+        smtp_breaker.record_failure()
+        logger.error("Error sending async email to %s, spooling: %s", email_to, e)
+        _spool(_with_expiry(msg), email_to)
+        return
+    except aiosmtplib.SMTPException as e:
+        # The relay answered, so it is healthy; only this message has a problem
+        if _is_permanent(e):
+            _record_smtp_success()
+            logger.error("Email to %s rejected by relay, not retried: %s", email_to, e)
+            return
+        # Deferred (4xx): no immediate replay, it would most likely be deferred too
+        if smtp_breaker.record_success():
+            MailSpool.schedule_replay()
+        logger.warning("Email to %s deferred by relay, spooling: %s", email_to, e)
+        _spool(_with_expiry(msg), email_to)
+        return
+
+    _record_smtp_success()
+    logger.info("Activation email sent asynchronously to %s", email_to)
+
+
+@timed_stage("smtp")
+async def check_smtp_connection() -> bool:
+    """
+    Probes the SMTP relay with a NOOP through the shared circuit breaker.
+    Returns False immediately, without network I/O, when the circuit is open.
+    """
+    if not smtp_breaker.allow_request():
+        return False
+
     try:
-        # Utilisation de aiosmtplib.send pour un envoi rapide
-        await aiosmtplib.send(
-            msg,
+        async with aiosmtplib.SMTP(
             hostname=settings.SMTP_HOST,
             port=settings.SMTP_PORT,
-        )
-        logger.info("Activation email sent asynchronously to %s", email_to)
-    except (aiosmtplib.SMTPException, ConnectionError) as e:
-        logger.error("Error sending async email to %s: %s", email_to, e)
+            timeout=settings.SMTP_TIMEOUT,
+        ) as server:
+            await server.noop()
+    except SMTP_ERRORS as e:
+        smtp_breaker.record_failure()
+        logger.error("SMTP probe failed: %s", e)
+        return False
+
+    _record_smtp_success()
+    return True
@@ -0,0 +1,211 @@
+"""
+Request profiling module.
+Records per-request stage timings (database, Bcrypt, SMTP), optionally runs
+cProfile on sampled or explicitly requested calls, and keeps slow or profiled
+requests in a bounded in-memory ring buffer for download.
+"""
+
+import cProfile
+import functools
+import hmac
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILING_HEADER = "X-Profiling-Token"
+
+# Stage timings (ms) of the request being handled; None when profiling is off
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "profiling_stages", default=None
+)
+
+
+@contextmanager
+def record_stage(name: str) -> Iterator[None]:
+    """
+    Adds the wall time spent in the block to the current request's `name` stage.
+    Costs a single ContextVar lookup when no request is being profiled.
+    """
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        stages[name] = stages.get(name, 0.0) + elapsed
+
+
+def timed_stage(name: str) -> Callable:
+    """
+    Decorator for coroutines: time spent awaiting them is recorded as stage `name`.
+    Because the timings live in a ContextVar, concurrent requests do not mix.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with record_stage(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Checks a profiling token against PROFILING_TOKEN in constant time."""
+    if not settings.PROFILING_TOKEN or not token:
+        return False
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str input.
+    # Header values are latin-1 decoded, which recovers the raw bytes sent.
+    try:
+        supplied = token.encode("latin-1")
+    except UnicodeEncodeError:
+        return False
+    return hmac.compare_digest(supplied, settings.PROFILING_TOKEN.encode())
+
+
+class RequestProfiler:
+    """
+    Holds the ring buffer of captured requests.
+    cProfile is process-wide, so only one request is profiled at a time; while
+    it runs, it also sees work from other requests sharing the event loop.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        slow_threshold_ms: float,
+        sample_rate: float,
+        exempt_prefixes: Tuple[str, ...] = (),
+    ) -> None:
+        self.slow_threshold_ms = slow_threshold_ms
+        self.sample_rate = sample_rate
+        # Paths never profiled nor captured (the admin routes reading the buffer)
+        self.exempt_prefixes = exempt_prefixes
+        self._records: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._profiler_lock = threading.Lock()
+
+    def _sampled(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def middleware(
+        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
+    ) -> Response:
+        """
+        HTTP middleware timing each request and capturing slow, requested or
+        sampled ones.
+        """
+        if request.url.path.startswith(self.exempt_prefixes):
+            return await call_next(request)
+
+        requested = is_authorized(request.headers.get(PROFILING_HEADER))
+        profiler: Optional[cProfile.Profile] = None
+        # Non-blocking: if another request is being profiled, only time this one
+        # pylint: disable-next=consider-using-with
+        if (requested or self._sampled()) and self._profiler_lock.acquire(False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        stages: Dict[str, float] = {}
+        token = _stages.set(stages)
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            _stages.reset(token)
+            if profiler is not None:
+                profiler.disable()
+                self._profiler_lock.release()
+
+        if requested or profiler is not None or duration_ms >= self.slow_threshold_ms:
+            record_id = self._capture(
+                request, response.status_code, duration_ms, stages, profiler
+            )
+            response.headers["X-Profile-Id"] = record_id
+        return response
+
+    def _capture(
+        self,
+        request: Request,
+        status_code: int,
+        duration_ms: float,
+        stages: Dict[str, float],
+        profiler: Optional[cProfile.Profile],
+    ) -> str:
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        profile_text: Optional[str] = None
+        if profiler is not None:
+            buffer = io.StringIO()
+            pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(
+                40
+            )
+            profile_text = buffer.getvalue()
+
+        record = {
+            "id": uuid.uuid4().hex[:12],
+            "timestamp": time.time(),
+            "method": request.method,
+            "path": request.url.path,
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "stages": {name: round(ms, 3) for name, ms in stages.items()},
+            "profiled": profile_text is not None,
+            "profile": profile_text,
+        }
+        self._records.append(record)
+        if duration_ms >= self.slow_threshold_ms:
+            logger.warning(
+                "Slow request %s %s took %.1f ms (stages: %s)",
+                request.method,
+                request.url.path,
+                duration_ms,
+                record["stages"],
+            )
+        return str(record["id"])
+
+    def list_records(self) -> List[Dict[str, Any]]:
+        """Returns captured requests, newest first, without the profile text."""
+        return [
+            {key: value for key, value in record.items() if key != "profile"}
+            for record in reversed(self._records)
+        ]
+
+    def get_record(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a captured request by id, including its profile text."""
+        return next((r for r in self._records if r["id"] == record_id), None)
+
+
+request_profiler = RequestProfiler(
+    capacity=settings.PROFILING_BUFFER_SIZE,
+    slow_threshold_ms=settings.PROFILING_SLOW_REQUEST_MS,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+)
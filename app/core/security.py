@@ -4,6 +4,7 @@ Handles password hashing and verification using Bcrypt.
 """
 
 from passlib.context import CryptContext
+from app.core.profiling import record_stage
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -14,7 +15,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Truncates input to 72 bytes for Bcrypt compatibility.
     """
     # Truncate to 72 bytes to prevent bcrypt ValueError for long strings
-    return pwd_context.verify(plain_password[:72], hashed_password)
+    with record_stage("bcrypt"):
+        return pwd_context.verify(plain_password[:72], hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -23,4 +25,5 @@ def get_password_hash(password: str) -> str:
     Truncates input to 72 bytes for Bcrypt compatibility.
     """
     # Truncate to 72 bytes to prevent bcrypt ValueError for long strings
-    return pwd_context.hash(password[:72])
+    with record_stage("bcrypt"):
+        return pwd_context.hash(password[:72])
@@ -0,0 +1,119 @@
+"""
+Session token utilities.
+Issues and verifies short-lived HMAC-SHA256 signed tokens so authenticated calls
+do not need a Bcrypt verification on every request. Verifying a token needs no
+database access; loading the user record afterwards is up to the caller.
+
+Token format: ``<kid>.<payload>.<signature>`` where payload is base64url JSON
+``{"sub": <email>, "exp": <unix time>}`` and the signature covers ``<kid>.<payload>``.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidTokenError(Exception):
+    """Raised when a token is malformed, badly signed, or expired."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenSigner:
+    """
+    Signs tokens with the active key and verifies them against every known key.
+    Keeping retired keys in the key set lets tokens issued before a rotation
+    stay valid until they expire.
+    """
+
+    def __init__(self, keys: Dict[str, bytes], active_kid: str) -> None:
+        if active_kid not in keys:
+            raise ValueError(f"Active signing key {active_kid!r} is not configured.")
+        self.keys = keys
+        self.active_kid = active_kid
+
+    @classmethod
+    def from_settings(cls) -> "TokenSigner":
+        """
+        Builds a signer from TOKEN_SIGNING_KEYS ("kid:secret,kid:secret").
+        The first key signs new tokens; the others are only used for verification.
+        """
+        keys: Dict[str, bytes] = {}
+        active_kid: Optional[str] = None
+        for entry in settings.TOKEN_SIGNING_KEYS.split(","):
+            if not entry.strip():
+                continue
+            kid, _, secret = entry.strip().partition(":")
+            if not kid or not secret:
+                raise ValueError("TOKEN_SIGNING_KEYS entries must be 'kid:secret'.")
+            keys[kid] = secret.encode()
+            active_kid = active_kid or kid
+
+        if active_kid is None:
+            logger.warning(
+                "TOKEN_SIGNING_KEYS is not set: using an ephemeral key. "
+                "Tokens will not survive a restart or be shared across instances."
+            )
+            active_kid = "ephemeral"
+            keys[active_kid] = secrets.token_bytes(32)
+        return cls(keys, active_kid)
+
+    def _sign(self, kid: str, payload: str) -> str:
+        digest = hmac.new(
+            self.keys[kid], f"{kid}.{payload}".encode(), hashlib.sha256
+        ).digest()
+        return _b64encode(digest)
+
+    @staticmethod
+    def _signature_matches(signature: str, expected: str) -> bool:
+        # Compare bytes: compare_digest raises TypeError on non-ASCII str input
+        return hmac.compare_digest(signature.encode(), expected.encode())
+
+    def create(self, subject: str, ttl: int) -> str:
+        """Returns a token for `subject` that expires in `ttl` seconds."""
+        claims = {"sub": subject, "exp": int(time.time()) + ttl}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{self.active_kid}.{payload}.{self._sign(self.active_kid, payload)}"
+
+    def verify(self, token: str) -> str:
+        """
+        Checks the signature (in constant time) and expiry of a token.
+        Returns the subject, or raises InvalidTokenError.
+        """
+        try:
+            kid, payload, signature = token.split(".")
+        except ValueError as e:
+            raise InvalidTokenError("Malformed token") from e
+
+        if kid not in self.keys:
+            raise InvalidTokenError("Unknown signing key")
+        if not self._signature_matches(signature, self._sign(kid, payload)):
+            raise InvalidTokenError("Invalid signature")
+
+        try:
+            claims = json.loads(_b64decode(payload))
+            subject, expires_at = str(claims["sub"]), float(claims["exp"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise InvalidTokenError("Malformed token payload") from e
+
+        if time.time() >= expires_at:
+            raise InvalidTokenError("Token expired")
+        return subject
+
+
+token_signer = TokenSigner.from_settings()
@@ -64,7 +64,8 @@ close_pool = DatabaseManager.close_pool
 async def init_db() -> None:
     """
     Initializes the database schema asynchronously.
-    Creates the 'users' table if it does not already exist.
+    Creates the 'users' and 'activation_codes' tables if they do not already exist,
+    and moves pending codes out of legacy 'users' columns.
     """
     logger.info("Ensuring database schema is initialized...")
     async for conn in get_db_connection():
@@ -74,12 +75,56 @@ async def init_db() -> None:
                 CREATE TABLE IF NOT EXISTS users (
                     email TEXT PRIMARY KEY,
                     password_hash TEXT NOT NULL,
-                    activation_code TEXT,
-                    code_expires_at DOUBLE PRECISION,
                     is_active BOOLEAN DEFAULT FALSE
                 );
             """
             )
+            await cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS activation_codes (
+                    email TEXT PRIMARY KEY,
+                    code TEXT NOT NULL,
+                    expires_at DOUBLE PRECISION NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS activation_codes_expires_at_idx
+                    ON activation_codes (expires_at);
+            """
+            )
+            await _migrate_legacy_activation_columns(cur)
             # autocommit is True in pool config, but explicit commit is safe
             await conn.commit()
     logger.info("Database initialization complete.")
+
+
+async def _migrate_legacy_activation_columns(cur: psycopg.AsyncCursor) -> None:
+    """
+    Copies pending codes from the former users.activation_code/code_expires_at
+    columns into 'activation_codes', then drops those columns.
+    Destructive: instances running the previous release still write these
+    columns, so they must be drained before a new instance starts.
+    """
+    await cur.execute(
+        """
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'users'
+          AND column_name = 'activation_code'
+        """
+    )
+    if await cur.fetchone() is None:
+        return
+
+    logger.info("Migrating activation codes out of the users table...")
+    await cur.execute(
+        """
+        INSERT INTO activation_codes (email, code, expires_at)
+        SELECT email, activation_code, code_expires_at FROM users
+        WHERE NOT is_active
+          AND activation_code IS NOT NULL
+          AND code_expires_at IS NOT NULL
+        ON CONFLICT (email) DO NOTHING;
+        ALTER TABLE users
+            DROP COLUMN IF EXISTS activation_code,
+            DROP COLUMN IF EXISTS code_expires_at;
+    """
+    )
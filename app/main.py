@@ -7,7 +7,11 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.endpoints import router
+from app.api.admin import router as admin_router
+from app.core.config import settings
+from app.core.profiling import request_profiler
 from app.db import init_db, init_pool, close_pool
+from app.core.email import MailSpool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,9 +32,12 @@ async def lifespan(_app: FastAPI):
     await init_db()
     logger.info("Application startup: Database tables ensured.")
 
+    # 3. Flush emails left in the spool by a previous SMTP outage
+    MailSpool.schedule_replay()
+
     yield
 
-    # 3. Clean up the pool on shutdown
+    # 4. Clean up the pool on shutdown
     await close_pool()
 
     logger.info("Application shutdown: Cleaning up resources.")
@@ -39,3 +46,11 @@ async def lifespan(_app: FastAPI):
 app = FastAPI(title="User Registration API", lifespan=lifespan)
 
 app.include_router(router, prefix="/api/v1")
+ADMIN_PREFIX = "/api/v1/admin"
+app.include_router(admin_router, prefix=ADMIN_PREFIX, tags=["admin"])
+
+# Request profiling adds no overhead unless enabled. Admin calls are exempt so
+# that reading the captures does not push them out of the ring buffer.
+if settings.PROFILING_ENABLED:
+    request_profiler.exempt_prefixes = (ADMIN_PREFIX,)
+    app.middleware("http")(request_profiler.middleware)
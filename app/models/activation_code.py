@@ -0,0 +1,152 @@
+"""
+Activation code storage.
+Keeps short-lived activation codes out of the users table, keyed by email.
+Two interchangeable backends are provided: a narrow PostgreSQL table (default)
+and an in-memory TTL store for single-node setups.
+"""
+
+import heapq
+import time
+from enum import Enum
+from typing import Dict, List, Protocol, Tuple
+
+from app.core.config import settings
+from app.core.profiling import timed_stage
+from app.db import get_db_connection
+
+
+class ConsumeResult(str, Enum):
+    """Outcome of an attempt to consume an activation code."""
+
+    CONSUMED = "consumed"
+    EXPIRED = "expired"
+    INVALID = "invalid"
+
+
+class ActivationCodeStore(Protocol):
+    """Interface shared by the activation code backends."""
+
+    async def set(self, email: str, code: str, ttl: float) -> None:
+        """Stores (or replaces) the code for an email, valid for `ttl` seconds."""
+
+    async def consume(self, email: str, code: str) -> ConsumeResult:
+        """Atomically removes the code if it matches and has not expired."""
+
+
+class ActivationCodeRepo:
+    """
+    PostgreSQL backend storing codes in the 'activation_codes' table.
+    Provides static methods using raw SQL, like UserRepo.
+    """
+
+    @staticmethod
+    @timed_stage("db")
+    async def set(email: str, code: str, ttl: float) -> None:
+        """Upserts the code for an email and purges codes that have expired."""
+        now = time.time()
+        async for conn in get_db_connection():
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "DELETE FROM activation_codes WHERE expires_at <= %s", (now,)
+                )
+                await cur.execute(
+                    """
+                    INSERT INTO activation_codes (email, code, expires_at)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (email)
+                    DO UPDATE SET code = EXCLUDED.code, expires_at = EXCLUDED.expires_at
+                    """,
+                    (email, code, now + ttl),
+                )
+
+    @staticmethod
+    @timed_stage("db")
+    async def consume(email: str, code: str) -> ConsumeResult:
+        """
+        Deletes the matching, unexpired code in a single statement so that
+        concurrent activations cannot use the same code twice.
+        """
+        now = time.time()
+        async for conn in get_db_connection():
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    DELETE FROM activation_codes
+                    WHERE email = %s AND code = %s AND expires_at > %s
+                    RETURNING email
+                    """,
+                    (email, code, now),
+                )
+                if await cur.fetchone():
+                    return ConsumeResult.CONSUMED
+
+                # Failure path only: tell an expired code from a wrong one
+                await cur.execute(
+                    """
+                    DELETE FROM activation_codes
+                    WHERE email = %s AND expires_at <= %s
+                    RETURNING email
+                    """,
+                    (email, now),
+                )
+                if await cur.fetchone():
+                    return ConsumeResult.EXPIRED
+        return ConsumeResult.INVALID
+
+
+class InMemoryActivationCodeStore:
+    """
+    Process-local backend for single-node deployments.
+    Expired entries are evicted lazily through a min-heap ordered by expiry.
+    """
+
+    def __init__(self) -> None:
+        self._codes: Dict[str, Tuple[str, float]] = {}
+        self._expiries: List[Tuple[float, str]] = []
+
+    def _purge_expired(self, now: float) -> None:
+        while self._expiries and self._expiries[0][0] <= now:
+            expires_at, email = heapq.heappop(self._expiries)
+            entry = self._codes.get(email)
+            # Skip heap entries made stale by a newer code for the same email
+            if entry is not None and entry[1] == expires_at:
+                del self._codes[email]
+
+    async def set(self, email: str, code: str, ttl: float) -> None:
+        """Stores (or replaces) the code for an email, valid for `ttl` seconds."""
+        now = time.time()
+        self._purge_expired(now)
+        expires_at = now + ttl
+        self._codes[email] = (code, expires_at)
+        heapq.heappush(self._expiries, (expires_at, email))
+
+    async def consume(self, email: str, code: str) -> ConsumeResult:
+        """
+        Removes the code if it matches and has not expired.
+        Atomic because no await happens between the check and the removal.
+        """
+        entry = self._codes.get(email)
+        if entry is None:
+            return ConsumeResult.INVALID
+        stored_code, expires_at = entry
+        if time.time() >= expires_at:
+            del self._codes[email]
+            return ConsumeResult.EXPIRED
+        if code != stored_code:
+            return ConsumeResult.INVALID
+        del self._codes[email]
+        return ConsumeResult.CONSUMED
+
+
+def _build_store() -> ActivationCodeStore:
+    """Selects the backend configured by ACTIVATION_CODE_STORE."""
+    if settings.ACTIVATION_CODE_STORE == "memory":
+        return InMemoryActivationCodeStore()
+    if settings.ACTIVATION_CODE_STORE == "postgres":
+        return ActivationCodeRepo()
+    raise ValueError(
+        f"Unknown ACTIVATION_CODE_STORE: {settings.ACTIVATION_CODE_STORE!r}"
+    )
+
+
+activation_codes: ActivationCodeStore = _build_store()
@@ -7,6 +7,7 @@ from typing import Optional, Any, Dict
 
 from pydantic import EmailStr
 
+from app.core.profiling import timed_stage
 from app.db import get_db_connection
 
 
@@ -17,29 +18,41 @@ class UserRepo:
     """
 
     @staticmethod
-    async def create(
-        email: str, password_hash: str, code: str, expires_at: float
-    ) -> None:
+    @timed_stage("db")
+    async def create(email: str, password_hash: str) -> None:
         """Inserts a new user record asynchronously."""
         async for conn in get_db_connection():
             async with conn.cursor() as cur:
                 await cur.execute(
                     """
-                    INSERT INTO users (email, password_hash, activation_code, code_expires_at)
-                    VALUES (%s, %s, %s, %s)
+                    INSERT INTO users (email, password_hash)
+                    VALUES (%s, %s)
                     """,
-                    (email, password_hash, code, expires_at),
+                    (email, password_hash),
                 )
 
     @staticmethod
+    @timed_stage("db")
+    async def delete(email: str) -> None:
+        """Deletes a user record asynchronously."""
+        async for conn in get_db_connection():
+            async with conn.cursor() as cur:
+                await cur.execute("DELETE FROM users WHERE email = %s", (email,))
+
+    @staticmethod
+    @timed_stage("db")
     async def get_by_email(email: str) -> Optional[Dict[str, Any]]:
         """Retrieves a user record asynchronously by email."""
         async for conn in get_db_connection():
             async with conn.cursor() as cur:
-                await cur.execute("SELECT * FROM users WHERE email = %s", (email,))
+                await cur.execute(
+                    "SELECT email, password_hash, is_active FROM users WHERE email = %s",
+                    (email,),
+                )
                 return await cur.fetchone()
 
     @staticmethod
+    @timed_stage("db")
     async def set_active(email: EmailStr) -> None:
         """
         Updates a user's status to active in the database.
@@ -0,0 +1,20 @@
+"""
+Shared test fixtures.
+Keeps every test away from the real mail spool and the shared SMTP circuit breaker.
+"""
+
+from unittest.mock import patch
+import pytest
+from app.core.config import settings
+from app.core.email import smtp_breaker
+
+
+@pytest.fixture(autouse=True)
+def spool_dir(tmp_path):
+    """Points the mail spool at a per-test directory and resets the breaker."""
+    directory = tmp_path / "mail_spool"
+    smtp_breaker.reset()
+    with patch.object(settings, "SMTP_SPOOL_DIR", str(directory)):
+        directory.mkdir(mode=0o700)
+        yield directory
+    smtp_breaker.reset()
@@ -0,0 +1,49 @@
+"""
+Unit tests for the in-memory activation code store.
+"""
+
+from unittest.mock import patch
+from app.models.activation_code import ConsumeResult, InMemoryActivationCodeStore
+
+
+async def test_consume_valid_code_once():
+    """Tests that a valid code is consumed exactly once."""
+    store = InMemoryActivationCodeStore()
+    await store.set("test@example.com", "1234", 60)
+
+    assert await store.consume("test@example.com", "1234") is ConsumeResult.CONSUMED
+    assert await store.consume("test@example.com", "1234") is ConsumeResult.INVALID
+
+
+async def test_wrong_code_keeps_entry():
+    """Tests that a wrong code is rejected without discarding the stored one."""
+    store = InMemoryActivationCodeStore()
+    await store.set("test@example.com", "1234", 60)
+
+    assert await store.consume("test@example.com", "0000") is ConsumeResult.INVALID
+    assert await store.consume("test@example.com", "1234") is ConsumeResult.CONSUMED
+
+
+async def test_expired_code():
+    """Tests that a code past its TTL is reported as expired."""
+    store = InMemoryActivationCodeStore()
+    await store.set("test@example.com", "1234", -10)
+
+    assert await store.consume("test@example.com", "1234") is ConsumeResult.EXPIRED
+
+
+async def test_expired_entries_are_evicted():
+    """Tests that expired codes are purged without touching newer ones."""
+    store = InMemoryActivationCodeStore()
+    with patch("app.models.activation_code.time.time", return_value=1000.0):
+        await store.set("old@example.com", "1111", 60)
+        await store.set("renewed@example.com", "2222", 60)
+        await store.set("renewed@example.com", "3333", 600)
+
+    with patch("app.models.activation_code.time.time", return_value=1100.0):
+        await store.set("new@example.com", "4444", 60)
+        # pylint: disable=protected-access
+        assert set(store._codes) == {"renewed@example.com", "new@example.com"}
+        assert (
+            await store.consume("renewed@example.com", "3333") is ConsumeResult.CONSUMED
+        )
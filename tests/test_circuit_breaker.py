@@ -0,0 +1,226 @@
+"""
+Unit tests for the SMTP circuit breaker and the on-disk mail spool.
+Uses a fake clock and a mocked aiosmtplib so no SMTP server is needed.
+"""
+
+import os
+from email.mime.text import MIMEText
+from unittest.mock import patch, AsyncMock
+import aiosmtplib
+from app.core.circuit_breaker import CircuitBreaker, CircuitState
+from app.core.config import settings
+from app.core.email import MailSpool, send_activation_email, smtp_breaker
+from app.core.profiling import _stages
+
+
+class FakeClock:  # pylint: disable=too-few-public-methods
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_after_threshold():
+    """Tests that the circuit opens after N consecutive failures and rejects calls."""
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=10)
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.OPEN
+    assert not breaker.allow_request()
+
+
+def test_breaker_half_open_after_cooldown():
+    """Tests the OPEN -> HALF_OPEN -> CLOSED cycle and the trial-call limit."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, recovery_timeout=10, clock=clock
+    )
+    breaker.record_failure()
+
+    clock.now = 10.0
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    assert breaker.record_success() is True
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_breaker_half_open_failure_reopens():
+    """Tests that a failed trial call re-opens the circuit for a new cool-down."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, recovery_timeout=10, clock=clock
+    )
+    breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.snapshot()["retry_in"] == 10.0
+
+
+def test_unreported_trial_slot_expires():
+    """Tests that a trial call that never reports back does not block the circuit."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, recovery_timeout=10, clock=clock
+    )
+    breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.allow_request()  # trial call is cancelled, never reported
+
+    clock.now = 15.0
+    assert not breaker.allow_request()
+    clock.now = 20.0
+    assert breaker.allow_request()
+
+
+async def test_send_failure_spools_email(spool_dir):
+    """Tests that an undeliverable email is written to the spool."""
+    with patch(
+        "app.core.email.aiosmtplib.send",
+        new=AsyncMock(side_effect=aiosmtplib.SMTPConnectError("down")),
+    ):
+        await send_activation_email("test@example.com", "1234")
+
+    assert len(list(spool_dir.glob("*.eml"))) == 1
+
+
+async def test_open_circuit_skips_smtp():
+    """Tests that no connection is attempted while the circuit is open."""
+    for _ in range(smtp_breaker.failure_threshold):
+        smtp_breaker.record_failure()
+
+    with patch("app.core.email.aiosmtplib.send", new=AsyncMock()) as mock_send:
+        await send_activation_email("test@example.com", "1234")
+
+    assert not mock_send.called
+    assert MailSpool.pending() == 1
+
+
+async def test_replay_delivers_spooled_emails(spool_dir):
+    """Tests that spooled emails are sent in order and removed from the spool."""
+    for _ in range(smtp_breaker.failure_threshold):
+        smtp_breaker.record_failure()
+    await send_activation_email("first@example.com", "1111")
+    await send_activation_email("second@example.com", "2222")
+    smtp_breaker.reset()
+
+    with patch("app.core.email.aiosmtplib.send", new=AsyncMock()) as mock_send:
+        delivered = await MailSpool.replay()
+
+    assert delivered == 2
+    assert [c.args[0]["To"] for c in mock_send.call_args_list] == [
+        "first@example.com",
+        "second@example.com",
+    ]
+    assert not list(spool_dir.iterdir())
+
+
+async def test_spool_write_failure_is_swallowed(tmp_path, caplog):
+    """Tests that an unwritable spool is logged instead of failing the caller."""
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    with patch.object(settings, "SMTP_SPOOL_DIR", str(blocker / "spool")), patch(
+        "app.core.email.aiosmtplib.send",
+        new=AsyncMock(side_effect=aiosmtplib.SMTPConnectError("down")),
+    ):
+        await send_activation_email("test@example.com", "1234")
+
+    assert "Could not spool email to test@example.com" in caplog.text
+    assert not list(tmp_path.rglob("*.eml"))
+
+
+async def test_replay_drops_expired_emails(spool_dir):
+    """Tests that spooled emails whose code has expired are discarded, not sent."""
+    for _ in range(smtp_breaker.failure_threshold):
+        smtp_breaker.record_failure()
+    with patch.object(settings, "ACTIVATION_CODE_TTL", -1):
+        await send_activation_email("expired@example.com", "1111")
+    await send_activation_email("fresh@example.com", "2222")
+    smtp_breaker.reset()
+
+    with patch("app.core.email.aiosmtplib.send", new=AsyncMock()) as mock_send:
+        delivered = await MailSpool.replay()
+
+    assert delivered == 1
+    [sent] = [c.args[0] for c in mock_send.call_args_list]
+    assert sent["To"] == "fresh@example.com"
+    assert sent["X-Expires-At"] is None
+    assert not list(spool_dir.iterdir())
+
+
+async def test_replay_task_does_not_inherit_request_context(spool_dir):
+    """Tests that replay SMTP time is not added to the triggering request's stages."""
+    for _ in range(smtp_breaker.failure_threshold):
+        smtp_breaker.record_failure()
+    await send_activation_email("test@example.com", "1234")
+    smtp_breaker.reset()
+
+    stages: dict = {}
+    token = _stages.set(stages)
+    try:
+        with patch("app.core.email.aiosmtplib.send", new=AsyncMock()):
+            MailSpool.schedule_replay()
+            await MailSpool._replay_task  # pylint: disable=protected-access
+    finally:
+        _stages.reset(token)
+
+    assert not list(spool_dir.iterdir())
+    assert not stages
+
+
+async def test_rejected_recipient_does_not_open_circuit(spool_dir):
+    """Tests that 5xx rejections leave the breaker closed and are not spooled."""
+    refused = aiosmtplib.SMTPRecipientsRefused(
+        [aiosmtplib.SMTPRecipientRefused(550, "No such user", "bad@example.com")]
+    )
+    with patch("app.core.email.aiosmtplib.send", new=AsyncMock(side_effect=refused)):
+        for _ in range(smtp_breaker.failure_threshold + 1):
+            await send_activation_email("bad@example.com", "1234")
+
+    assert smtp_breaker.state is CircuitState.CLOSED
+    assert not list(spool_dir.iterdir())
+
+
+async def test_deferred_email_is_spooled_without_failure(spool_dir):
+    """Tests that a 4xx reply spools the email but does not count as an outage."""
+    deferred = aiosmtplib.SMTPDataError(451, "Try again later")
+    with patch("app.core.email.aiosmtplib.send", new=AsyncMock(side_effect=deferred)):
+        for _ in range(smtp_breaker.failure_threshold):
+            await send_activation_email("test@example.com", "1234")
+
+    assert smtp_breaker.state is CircuitState.CLOSED
+    assert len(list(spool_dir.glob("*.eml"))) == smtp_breaker.failure_threshold
+
+
+def test_spool_is_private(spool_dir):
+    """Tests that the spool directory and spooled files are closed to other users."""
+    spool_dir.chmod(0o755)
+
+    path = MailSpool.put(MIMEText("code"))
+
+    assert spool_dir.stat().st_mode & 0o777 == 0o700
+    assert path.stat().st_mode & 0o777 == 0o600
+
+
+async def test_replay_refuses_foreign_spool():
+    """Tests that a spool directory owned by another user is never relayed."""
+    MailSpool.put(MIMEText("planted"))
+
+    with patch("app.core.email.os.getuid", return_value=os.getuid() + 1), patch(
+        "app.core.email.aiosmtplib.send", new=AsyncMock()
+    ) as mock_send:
+        delivered = await MailSpool.replay()
+
+    assert delivered == 0
+    assert not mock_send.called
@@ -3,12 +3,12 @@ Integration tests for the User API.
 Tests the full flow (Registration -> DB -> Activation) using a real PostgreSQL instance.
 """
 
-import time
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 from app.db import get_db_connection, DatabaseManager
 from app.models.user import UserRepo
+from app.models.activation_code import ActivationCodeRepo, ConsumeResult
 from app.core.security import get_password_hash
 
 client = TestClient(app)
@@ -29,11 +29,14 @@ pytestmark = pytest.mark.asyncio
 @pytest.fixture(autouse=True)
 async def clean_db():
     """
-    Cleans the users table before each integration test.
-    Only deletes users with an email ending in @example.com.
+    Cleans the users and activation_codes tables before each integration test.
+    Only deletes rows with an email ending in @example.com.
     """
     async for conn in get_db_connection():
         async with conn.cursor() as cur:
+            await cur.execute(
+                "DELETE FROM activation_codes WHERE email LIKE '%%@example.com'"
+            )
             await cur.execute("DELETE FROM users WHERE email LIKE '%%@example.com'")
             await conn.commit()
     yield
@@ -59,7 +62,12 @@ async def test_full_registration_and_activation_flow():
     user_in_db = await UserRepo.get_by_email(email)
     assert user_in_db is not None
     assert user_in_db["is_active"] is False
-    activation_code = user_in_db["activation_code"]
+    async for conn in get_db_connection():
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT code FROM activation_codes WHERE email = %s", (email,)
+            )
+            activation_code = (await cur.fetchone())["code"]
 
     # 3. Account activation via API (using Basic Auth)
     act_response = client.post(
@@ -72,6 +80,12 @@ async def test_full_registration_and_activation_flow():
     updated_user = await UserRepo.get_by_email(email)
     assert updated_user["is_active"] is True
 
+    # 5. The code has been consumed and cannot be reused
+    assert (
+        await ActivationCodeRepo.consume(email, activation_code)
+        is ConsumeResult.INVALID
+    )
+
 
 @pytest.mark.asyncio
 async def test_activation_fails_with_wrong_code():
@@ -95,10 +109,9 @@ async def test_activation_fails_after_expiry():
     email = "expired@example.com"
     password = "password123"
 
-    expired_time = time.time() - 10
-
-    # We await the direct repository create call
-    await UserRepo.create(email, get_password_hash(password), "9999", expired_time)
+    # We await the direct repository calls (code expired 10 seconds ago)
+    await UserRepo.create(email, get_password_hash(password))
+    await ActivationCodeRepo.set(email, "9999", -10)
 
     act_response = client.post(
         "/api/v1/activate", json={"code": "9999"}, auth=(email, password)
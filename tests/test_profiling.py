@@ -0,0 +1,146 @@
+"""
+Unit tests for the request profiling middleware and its admin endpoints.
+Uses a minimal FastAPI app so the middleware can be enabled per test.
+"""
+
+import asyncio
+from unittest.mock import patch
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.api.admin import router as admin_router
+from app.core.profiling import RequestProfiler, record_stage, timed_stage
+from app.main import ADMIN_PREFIX, app
+
+TOKEN = "test-profiling-token"
+
+
+@timed_stage("db")
+async def fake_query() -> None:
+    """Simulates time spent awaiting the database."""
+    await asyncio.sleep(0.01)
+
+
+def build_client(profiler: RequestProfiler) -> TestClient:
+    """Returns a client for a small app wrapped by the given profiler."""
+    test_app = FastAPI()
+    test_app.middleware("http")(profiler.middleware)
+
+    @test_app.get("/work")
+    async def work():
+        await fake_query()
+        with record_stage("bcrypt"):
+            pass
+        return {"ok": True}
+
+    return TestClient(test_app)
+
+
+@pytest.fixture(autouse=True)
+def profiling_token():
+    """Configures the profiling token for the duration of a test."""
+    with patch.object(settings, "PROFILING_TOKEN", TOKEN):
+        yield
+
+
+def test_fast_request_not_captured():
+    """Tests that requests under the threshold are not kept."""
+    profiler = RequestProfiler(capacity=5, slow_threshold_ms=10_000, sample_rate=0)
+
+    response = build_client(profiler).get("/work")
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert not profiler.list_records()
+
+
+def test_slow_request_captured_with_stages():
+    """Tests that slow requests are captured with their stage timings."""
+    profiler = RequestProfiler(capacity=5, slow_threshold_ms=0, sample_rate=0)
+
+    response = build_client(profiler).get("/work")
+
+    [record] = profiler.list_records()
+    assert record["id"] == response.headers["X-Profile-Id"]
+    assert record["stages"]["db"] >= 10
+    assert "bcrypt" in record["stages"]
+    assert record["profiled"] is False
+
+
+def test_authorized_header_profiles_request():
+    """Tests that a valid profiling header triggers a cProfile capture."""
+    profiler = RequestProfiler(capacity=5, slow_threshold_ms=10_000, sample_rate=0)
+
+    response = build_client(profiler).get("/work", headers={"X-Profiling-Token": TOKEN})
+
+    record = profiler.get_record(response.headers["X-Profile-Id"])
+    assert record["profiled"] is True
+    assert "function calls" in record["profile"]
+
+
+def test_sampled_request_captured():
+    """Tests that a request picked by the sample rate is kept with its profile."""
+    profiler = RequestProfiler(capacity=5, slow_threshold_ms=10_000, sample_rate=1)
+
+    response = build_client(profiler).get("/work")
+
+    record = profiler.get_record(response.headers["X-Profile-Id"])
+    assert record["profiled"] is True
+    assert "function calls" in record["profile"]
+
+
+def test_non_ascii_profiling_header_ignored():
+    """Tests that a non-ASCII profiling header is refused instead of crashing."""
+    profiler = RequestProfiler(capacity=5, slow_threshold_ms=10_000, sample_rate=0)
+
+    response = build_client(profiler).get(
+        "/work", headers={"X-Profiling-Token": b"\xe9"}
+    )
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    admin_response = TestClient(app).get(
+        "/api/v1/admin/profiles", headers={"X-Profiling-Token": b"\xe9"}
+    )
+    assert admin_response.status_code == 403
+
+
+def test_ring_buffer_is_bounded():
+    """Tests that only the most recent captures are kept."""
+    profiler = RequestProfiler(capacity=2, slow_threshold_ms=0, sample_rate=0)
+    client = build_client(profiler)
+
+    ids = [client.get("/work").headers["X-Profile-Id"] for _ in range(3)]
+
+    assert [r["id"] for r in profiler.list_records()] == ids[:0:-1]
+
+
+def test_admin_calls_do_not_evict_captures():
+    """Tests that listing profiles is never captured and keeps earlier records."""
+    profiler = RequestProfiler(
+        capacity=3, slow_threshold_ms=0, sample_rate=0, exempt_prefixes=(ADMIN_PREFIX,)
+    )
+    client = build_client(profiler)
+    client.app.include_router(admin_router, prefix=ADMIN_PREFIX)
+    slow_id = client.get("/work").headers["X-Profile-Id"]
+
+    with patch("app.api.admin.request_profiler", profiler):
+        for _ in range(5):
+            response = client.get(
+                f"{ADMIN_PREFIX}/profiles", headers={"X-Profiling-Token": TOKEN}
+            )
+            assert "X-Profile-Id" not in response.headers
+
+    assert [r["id"] for r in response.json()] == [slow_id]
+
+
+def test_admin_endpoint_requires_token():
+    """Tests that captured profiles are only served with the profiling token."""
+    client = TestClient(app)
+
+    assert client.get("/api/v1/admin/profiles").status_code == 403
+    response = client.get(
+        "/api/v1/admin/profiles", headers={"X-Profiling-Token": TOKEN}
+    )
+    assert response.status_code == 200
@@ -0,0 +1,57 @@
+"""
+Unit tests for signed session tokens.
+"""
+
+from unittest.mock import patch
+import pytest
+from app.core.tokens import InvalidTokenError, TokenSigner
+
+
+def test_token_roundtrip():
+    """Tests that a freshly issued token verifies to its subject."""
+    signer = TokenSigner({"k1": b"secret"}, "k1")
+
+    assert signer.verify(signer.create("test@example.com", 60)) == "test@example.com"
+
+
+def test_tampered_token_rejected():
+    """Tests that changing the payload invalidates the signature."""
+    signer = TokenSigner({"k1": b"secret"}, "k1")
+    kid, _, signature = signer.create("test@example.com", 60).split(".")
+    forged_payload = signer.create("admin@example.com", 60).split(".")[1]
+
+    with pytest.raises(InvalidTokenError):
+        signer.verify(f"{kid}.{forged_payload}.{signature}")
+
+
+def test_expired_token_rejected():
+    """Tests that a token is refused once its expiry has passed."""
+    signer = TokenSigner({"k1": b"secret"}, "k1")
+    with patch("app.core.tokens.time.time", return_value=1000.0):
+        token = signer.create("test@example.com", 60)
+
+    with patch("app.core.tokens.time.time", return_value=1060.0):
+        with pytest.raises(InvalidTokenError):
+            signer.verify(token)
+
+
+def test_key_rotation():
+    """Tests that tokens signed with a retired key stay valid until it is removed."""
+    old_signer = TokenSigner({"k1": b"old"}, "k1")
+    token = old_signer.create("test@example.com", 60)
+
+    rotated = TokenSigner({"k2": b"new", "k1": b"old"}, "k2")
+    assert rotated.verify(token) == "test@example.com"
+    assert rotated.create("test@example.com", 60).startswith("k2.")
+
+    with pytest.raises(InvalidTokenError):
+        TokenSigner({"k2": b"new"}, "k2").verify(token)
+
+
+def test_non_ascii_signature_rejected():
+    """Tests that a non-ASCII signature is refused rather than raising TypeError."""
+    signer = TokenSigner({"k1": b"secret"}, "k1")
+    kid, payload, _ = signer.create("test@example.com", 60).split(".")
+
+    with pytest.raises(InvalidTokenError):
+        signer.verify(f"{kid}.{payload}.\xe9")